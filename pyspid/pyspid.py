@@ -6,9 +6,11 @@ Property:
 
 Functions:
     get_location() - gets the current pointing
-    get_response() - talks to the rotator, keeps trying for
-                     10 attempts or until a repsonce of the
-                     correct length
+    request_location() - asks for the current pointing, returns immediately
+    read_location() - reads the pointing asked for by request_location()
+    get_response() - talks to the rotator, keeps trying with
+                     increasing waits for up to 3 seconds or until
+                     a repsonce of the correct length and framing
     go_to() - send the rotator to this postion
     stop() - stop the rotator where ever it is
     end() - end the serial connection to the rotator
@@ -34,15 +36,43 @@ with one SPID rotator.
 Behavior might be different for different models/versions.
 """
 import logging
-import os
-from collections import namedtuple
-from time import sleep
+from time import monotonic, sleep
+from typing import NamedTuple
 
 import serial
 
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
-five_0 = chr(0) + chr(0) + chr(0) + chr(0) + chr(0)
+FIVE_0 = b"\x00\x00\x00\x00\x00"
+# Precomputed command frames, 'W' + ten empty bytes + command + terminator
+STATUS_CMD = bytes([87]) + FIVE_0 + FIVE_0 + bytes([31, 32])
+STOP_CMD = bytes([87]) + FIVE_0 + FIVE_0 + bytes([15, 32])
+
+
+class AzElTuple(NamedTuple):
+    """
+    Azimuth and Elevation in degrees.
+    """
+
+    Az: float
+    El: float
+
+
+# Length of the rotator's status response, in bytes
+RESPONSE_LENGTH = 12
+# Fixed port read timeout, reads return sooner once the bytes arrive,
+# in seconds
+READ_TIMEOUT = 0.1
+# How long read_location() waits for a pending response, in seconds
+RESPONSE_DEADLINE = 1.0
+# get_response() waits for its first attempt as long as the command and
+# response take on the wire (8N1, so 10 bits a byte) plus EXCHANGE_MARGIN,
+# but at least MIN_FIRST_ATTEMPT_WAIT, doubling every retry, and gives up
+# after GIVE_UP_DEADLINE, in seconds
+BITS_PER_BYTE = 10
+EXCHANGE_MARGIN = 0.25
+MIN_FIRST_ATTEMPT_WAIT = 0.5
+GIVE_UP_DEADLINE = 3.0
 
 
 class PySpid:
@@ -58,13 +88,18 @@ class PySpid:
         # go_to_alt: float, go_to_az: float,
         # self.go_to_altitude = go_to_alt
         # self.go_to_elevation = go_to_elivation
+        # Last known pointing, nan until the first get_location() so the
+        # out of range warnings in go_to() can always format it
+        self._az = float("nan")
+        self._el = float("nan")
         self.port = port
-        self.serial_obj = serial.Serial(port, 600, timeout=0)
+        try:
+            self.serial_obj = serial.Serial(port, 600, timeout=READ_TIMEOUT)
+        except serial.SerialException as serial_error:
+            raise ValueError(f"Could not open {port}!") from serial_error
         response = self.get_response()
         self.az_multi = response[5]
         self.el_multi = response[10]
-        self._az = None
-        self._el = None
 
     @property
     def port(self):
@@ -75,14 +110,9 @@ class PySpid:
 
     @port.setter
     def port(self, port_str: str):
-        # check to see if this exists
-        # from https://stackoverflow.com/a/33685629
-        try:
-            os.stat(port_str)
-        except OSError as os_error:
-            raise ValueError(f"Given {port_str}, which does not exist!") from os_error
+        # serial.Serial checks the port exists when it opens it
         self._port = port_str
-        logging.debug("Set port to %s", port_str)
+        logger.debug("Set port to %s", port_str)
 
     # @property
     # def go_to_elevation(self):
@@ -91,7 +121,7 @@ class PySpid:
     # @go_to_elevation.setter
     # def go_to_elevation(self, el):
     #     if not 0 <= el <= 180:
-    #         logging.warning(
+    #         logger.warning(
     #             "%f is outside [0, 180], altitude staying at %f",
     #             el,
     #             self.go_to_elevation,
@@ -106,7 +136,7 @@ class PySpid:
     # @go_to_azimuth.setter
     # def go_to_azimuth(self, az):
     #     if not 0 <= az <= 360:
-    #         logging.warning(
+    #         logger.warning(
     #             "%f is outside [0, 360], azimuth staying at %f",
     #             az,
     #             self.go_to_azimuth,
@@ -114,16 +144,41 @@ class PySpid:
     #     else:
     #         self._go_to_azimuth = az
 
-    def get_location(self) -> namedtuple:
+    def get_location(self) -> AzElTuple:
         """
         This function talks to the rotator and gets the location.
+        Only the status command is sent, so the rotator keeps moving.
         """
-        out = chr(87) + five_0 + five_0 + chr(15) + chr(32)
-        out_resp = self.serial_obj.write(out.encode())
-        logging.debug("Out response: %s", out_resp)
-        # Wait for answer from controller
-        sleep(0.75)
         response = self.get_response()
+        return self._parse_location(response)
+
+    def request_location(self) -> None:
+        """
+        Asks the rotator for its location without waiting for the answer,
+        collect it with read_location(). This lets the caller do other work
+        while the rotator responds.
+        """
+        # Start from an empty buffer, so only this reply gets read
+        self.serial_obj.reset_input_buffer()
+        _ = self.serial_obj.write(STATUS_CMD)
+
+    def read_location(self) -> AzElTuple:
+        """
+        Reads the answer to a previous request_location(). If it does not
+        arrive in time, or is garbled, falls back to get_response().
+        """
+        response = self._read_response()
+        if not self._is_valid_response(response):
+            logger.warning("Pending location response timed out, asking again")
+            # Drop the partial reply before asking again
+            self.serial_obj.reset_input_buffer()
+            response = self.get_response()
+        return self._parse_location(response)
+
+    def _parse_location(self, response: bytes) -> AzElTuple:
+        """
+        Decodes the azimuth and elevation out of a status response.
+        """
         self._az = response[1] * 100 + response[2] * 10 + response[3] + response[4] / 10
         self._el = response[6] * 100 + response[7] * 10 + response[8] + response[9] / 10
         # Since the controller sends the status based on 0 degrees = 360
@@ -132,39 +187,72 @@ class PySpid:
         # jwk: need to subtract off another
         # 360 for some unknown reason
         self._el -= 360
-        logging.debug(
+        logger.debug(
             "Rotator at %.1f Deg Azimuth and %.1f Deg Elevation",
             self._az,
             self._el,
         )
-        logging.debug(
+        logger.debug(
             "Azimuth multiplier: %i, Elevation Multiplier is %i",
             response[5],
             response[10],
         )
 
-        alt_az_tuple = namedtuple("current_Alt_Az", ("Alt, Az"))
-        return alt_az_tuple(self._az, self._el)
+        return AzElTuple(self._az, self._el)
+
+    @staticmethod
+    def _is_valid_response(response: bytes) -> bool:
+        """
+        Whether response is a full frame, starting with 'W' and ending
+        with a space, rather than a partial or shifted one.
+        """
+        return (
+            len(response) == RESPONSE_LENGTH
+            and response[0] == STATUS_CMD[0]
+            and response[-1] == STATUS_CMD[-1]
+        )
+
+    def _read_response(self, deadline: float = RESPONSE_DEADLINE) -> bytearray:
+        """
+        Reads a response with blocking reads, which return as soon as
+        the full response arrives, until deadline seconds pass.
+        The port timeout stays fixed, changing it reconfigures the port.
+        """
+        response = bytearray()
+        end_time = monotonic() + deadline
+        while len(response) < RESPONSE_LENGTH and monotonic() < end_time:
+            response += self.serial_obj.read(RESPONSE_LENGTH - len(response))
+        logger.debug("response: %s", response)
+        return response
 
     def get_response(self):
         """
         This tries to communicate with the rotator,
         It sometimes takes multiple tries to get a response,
-        hence the loop
-        """
-        out = chr(87) + five_0 + five_0 + chr(31) + chr(32)
-        count = 0
-        response = b""
-        while count < 10:
-            _ = self.serial_obj.write(out.encode())
-            sleep(0.75)
-            response = self.serial_obj.read(12)
-            logging.debug("response: %s", response)
-            if len(response) >= 12:
+        hence the loop. The first attempt waits for as long as the
+        exchange takes at the port's baudrate, each retry waits twice
+        as long as the last, until GIVE_UP_DEADLINE has passed.
+        """
+        exchange_time = (
+            (len(STATUS_CMD) + RESPONSE_LENGTH)
+            * BITS_PER_BYTE
+            / self.serial_obj.baudrate
+        )
+        wait = max(MIN_FIRST_ATTEMPT_WAIT, exchange_time + EXCHANGE_MARGIN)
+        start = monotonic()
+        while True:
+            # Drop any late or partial reply, so it can't shift this one
+            self.serial_obj.reset_input_buffer()
+            _ = self.serial_obj.write(STATUS_CMD)
+            remaining = max(0.0, GIVE_UP_DEADLINE - (monotonic() - start))
+            response = self._read_response(min(wait, remaining))
+            if self._is_valid_response(response):
                 break
-        else:
-            logging.error("Did not get response, closing!")
-            self.end()
+            if monotonic() - start >= GIVE_UP_DEADLINE:
+                logger.error("Did not get response, closing!")
+                self.end()
+                break
+            wait *= 2
         return response
 
     def go_to(self, az: float = None, el: float = None) -> bool:
@@ -179,10 +267,10 @@ class PySpid:
             success - weather the message was sent.
         """
         if not 0 <= el <= 180:
-            logging.warning("%f is outside [0, 180], staying at %f EL", el, self._el)
+            logger.warning("%f is outside [0, 180], staying at %f EL", el, self._el)
             return False
         if not 0 <= az <= 360:
-            logging.warning(
+            logger.warning(
                 "%f is outside [0, 360], staying at %f az",
                 az,
                 self._az,
@@ -192,46 +280,27 @@ class PySpid:
         az += 2 * 360
         el += 360
 
-        az *= self.az_multi
-        el *= self.el_multi
-
-        az = str(az)
-        el = str(el)
-
-        if len(az) == 3:
-            logging.debug("Padding az w/ 0")
-            az = "0" + az
-        if len(el) == 3:
-            logging.debug("Padding el w/ 0")
-            el = "0" + el
-
-        # Message to send
-        message = (
-            chr(87)
-            + az
-            + chr(self.az_multi)
-            + el
-            + chr(self.el_multi)
-            + chr(47)
-            + chr(32)
-        )
+        az_i = int(round(az * self.az_multi))
+        el_i = int(round(el * self.el_multi))
+
+        # Message to send, positions are zero padded ASCII integers
+        message = b"W%04d%c%04d%c/ " % (az_i, self.az_multi, el_i, self.el_multi)
 
         # Send message
-        _ = self.serial_obj.write(message.encode())
+        _ = self.serial_obj.write(message)
         return True
 
     def stop(self):
         """
         Stops the rotator.
         """
-        stop_message = chr(87) + five_0 + five_0 + chr(15) + chr(32)
-        _ = self.serial_obj.write(stop_message.encode())
+        _ = self.serial_obj.write(STOP_CMD)
         sleep(0.75)
 
     def end(self):
         """
         Closes the port and exits
         """
-        logging.debug("Closing port %s and exiting", self._port)
+        logger.debug("Closing port %s and exiting", self._port)
         self.serial_obj.close()  # close the port
         # sys.exit()  $ probably don't want to exit
@@ -11,24 +11,64 @@ Properities:
     on_source - If the antenna is on source (and tracking)
 
 Functions:
-    _tracker - Tracks a celestial coordinate, called if
-               RA and Dec are None
-    _update_location - Updates telescope location, called if
-                       RA or Dec are None.
+    _tracker - Tracks a celestial coordinate if RA and Dec are given,
+               otherwise only updates the telescope location.
+    _now - The current time, offset from a fixed epoch
+    _fill_track_grid - Precomputes the target's Alt & Az over the next hour
+    _track_alt_az - Interpolates the target's Alt & Az from that grid
     end - Ends the loop and closes the serial port.
 """
 import logging
 import threading
-from collections import namedtuple
-from datetime import datetime, timedelta
-from time import sleep
+from math import acos, cos, degrees, radians, sin
+from time import monotonic
+from typing import NamedTuple
 
+import numpy as np
 from astropy import units as u
 from astropy.coordinates import AltAz, EarthLocation, SkyCoord
-from astropy.time import Time
+from astropy.time import Time, TimeDelta
 
 from pyspid import PySpid
 
+logger = logging.getLogger(__name__)
+
+
+class AltAzTuple(NamedTuple):
+    """
+    Altitude and Azimuth in degrees.
+    """
+
+    Alt: float
+    Az: float
+
+
+class RaDecTuple(NamedTuple):
+    """
+    Right Ascension and Declination in degrees.
+    """
+
+    RA: float
+    Dec: float
+
+
+class LBTuple(NamedTuple):
+    """
+    Galactic Longitude and Latitude in degrees.
+    """
+
+    l: float
+    b: float
+
+
+# Spacing and number of samples of the precomputed target Alt/Az grid,
+# the default covers the next hour in one minute steps
+GRID_SPACING = 60
+GRID_LENGTH = 61
+# Within this many degrees of the horizon or zenith, linear
+# interpolation is not good enough, so do the exact transform
+EXACT_ALT_MARGIN = 5.0
+
 
 class SpidTracker:
     """
@@ -72,74 +112,87 @@ class SpidTracker:
 
         """
         self.pyspid_obj = PySpid(port)
-        self.update = True
+        self._stop_event = threading.Event()
         self.on_source = False
         self.current_az = None
         self.current_alt = None
+        self._alt_az_cached = AltAzTuple(None, None)
+        self._t_grid = np.empty(0)
+        self._alt_grid = np.empty(0)
+        self._az_grid = np.empty(0)
+        self._skycoord = None
+        self._skycoord_key = None
+        # Later times are offsets from this epoch, which is cheaper
+        # than converting a fresh datetime every time
+        self._epoch = Time.now()
+        self._t0 = monotonic()
 
         if not 0 <= tolerance < 30:
             raise ValueError("tolerance must be [0,30), given {tolerance}")
         self.location = EarthLocation(
             lat=lat * u.degree, lon=lon * u.degree, height=height * u.meter
         )
-        logging.debug("Using earth location %s", self.location)
+        logger.debug("Using earth location %s", self.location)
 
         if ra is not None and dec is not None:
             self.track_coord = SkyCoord(ra * u.degree, dec * u.degree, frame="icrs")
-            logging.info("Tracking %s", self.track_coord)
-            thread = threading.Thread(
-                target=self._tracker,
-                args=(
-                    self.location,
-                    tolerance,
-                    cadence,
-                ),
-            )
-            thread.daemon = True
-            thread.start()
+            logger.info("Tracking %s", self.track_coord)
         else:
-            logging.info("RA+Dec not given, updating location only")
-            thread = threading.Thread(target=self._update_location, args=(cadence,))
-            thread.daemon = True
-            thread.start()
+            self.track_coord = None
+            logger.info("RA+Dec not given, updating location only")
+        thread = threading.Thread(
+            target=self._tracker,
+            args=(
+                self.location,
+                tolerance,
+                cadence,
+            ),
+        )
+        thread.daemon = True
+        thread.start()
 
     @property
-    def current_alt_az(self) -> namedtuple:
+    def current_alt_az(self) -> AltAzTuple:
         """
-        The current Altitude and Azimuth in degrees.
+        The current Altitude and Azimuth in degrees,
+        cached when the tracker refreshes the pointing.
         """
-        alt_az_tuple = namedtuple("current_Alt_Az", ("Alt, Az"))
-        return alt_az_tuple(self.current_alt, self.current_az)
+        return self._alt_az_cached
 
     @property
-    def current_ra_dec(self) -> namedtuple:
+    def current_ra_dec(self) -> RaDecTuple:
         """
         The current Right Ascension and Declination in degrees.
         """
-        current_time = Time(datetime.now())
-        alt_az = AltAz(location=self.location, obstime=current_time)
-        telescope_pointing = SkyCoord(
-            az=self.current_az * u.degree, alt=self.current_alt * u.degree, frame=alt_az
-        )
-        ra_dec_tuple = namedtuple("current_RA_Dec", ("RA", "Dec"))
-        return ra_dec_tuple(
-            telescope_pointing.icrs.ra.deg, telescope_pointing.icrs.dec.deg
-        )
+        telescope_pointing = self._current_skycoord()
+        return RaDecTuple(telescope_pointing.ra.deg, telescope_pointing.dec.deg)
 
     @property
-    def current_l_b(self) -> namedtuple:
+    def current_l_b(self) -> LBTuple:
         """
         The current Galactic Longitude and Latitude in degrees.
         """
-        current_time = Time(datetime.now())
-        alt_az = AltAz(location=self.location, obstime=current_time)
-        telescope_pointing = SkyCoord(
-            az=self.current_az * u.degree, alt=self.current_alt * u.degree, frame=alt_az
-        )
-        l_b_tuple = namedtuple("current_l_b", ("l", "b"))
-        return l_b_tuple(
-            telescope_pointing.galactic.l.deg, telescope_pointing.galactic.b.deg
-        )
+        telescope_pointing = self._current_skycoord().galactic
+        return LBTuple(telescope_pointing.l.deg, telescope_pointing.b.deg)
+
+    def _current_skycoord(self) -> SkyCoord:
+        """
+        The current pointing in ICRS. The Alt/Az to ICRS transform is memoized
+        on the pointing and the time rounded to 0.1s, so reading RA & Dec and
+        l & b together only transforms once.
+        """
+        current_time = self._now()
+        key = (self.current_alt, self.current_az, round(current_time.unix, 1))
+        if key != self._skycoord_key:
+            alt_az = AltAz(location=self.location, obstime=current_time)
+            telescope_pointing = SkyCoord(
+                az=self.current_az * u.degree,
+                alt=self.current_alt * u.degree,
+                frame=alt_az,
+            )
+            self._skycoord = telescope_pointing.icrs
+            self._skycoord_key = key
+        return self._skycoord
 
     @property
     def on_souce(self):
@@ -149,11 +202,61 @@ class SpidTracker:
         """
         return self.on_source
 
+    def _now(self) -> Time:
+        """
+        The current time, as the epoch plus the monotonic time since.
+        """
+        return self._epoch + TimeDelta(monotonic() - self._t0, format="sec")
+
+    def _fill_track_grid(self, location: object, start_time: Time) -> None:
+        """
+        Transforms the target to Alt/Az on a grid of times starting at
+        start_time, all in one vectorized astropy call.
+
+        args:
+            location - Astropy location object for the telescope
+
+            start_time - Time of the first grid sample
+        """
+        obstimes = start_time + np.arange(GRID_LENGTH) * GRID_SPACING * u.second
+        track_altaz = self.track_coord.transform_to(
+            AltAz(location=location, obstime=obstimes)
+        )
+        self._t_grid = obstimes.unix
+        self._alt_grid = track_altaz.alt.deg
+        # unwrap so interpolating across 0/360 az does not sweep the sky
+        self._az_grid = np.degrees(np.unwrap(track_altaz.az.rad))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Filled target Alt/Az grid from %s", start_time.iso)
+
+    def _track_alt_az(self, location: object, obstime: Time) -> AltAzTuple:
+        """
+        The target's Altitude and Azimuth in degrees at obstime, interpolated
+        from the precomputed grid, which gets refilled when obstime nears its end.
+
+        args:
+            location - Astropy location object for the telescope
+
+            obstime - Time to find the target's position at
+        """
+        now_s = obstime.unix
+        if len(self._t_grid) < 2 or not self._t_grid[0] <= now_s <= self._t_grid[-2]:
+            self._fill_track_grid(location, obstime)
+        alt = float(np.interp(now_s, self._t_grid, self._alt_grid))
+        if not EXACT_ALT_MARGIN < alt < 90 - EXACT_ALT_MARGIN:
+            track_altaz = self.track_coord.transform_to(
+                AltAz(location=location, obstime=obstime)
+            )
+            return AltAzTuple(track_altaz.alt.deg, track_altaz.az.deg)
+        az = float(np.interp(now_s, self._t_grid, self._az_grid)) % 360
+        return AltAzTuple(alt, az)
+
     def _tracker(
         self, location: object, tolerance: float = 2.0, cadence: int = 30
     ) -> None:
         """
-        Tracks the requestied position.
+        Tracks the requestied position. If there is no position to track,
+        only updates the pointing location without moving the telescope.
 
         args:
             location - Astropy location object for the telescope
@@ -163,7 +266,7 @@ class SpidTracker:
 
             cadence - how often to check the telescope position, in seconds.
 
-        This function loops while self.update == True,
+        This function loops until end() is called,
         everytime it loops it checks the separation between the antenna and the source
         If this separation is greater than tolerance, this will send a command to move
         move the antenna will be in cadence seconds. I did this to try and keep the main
@@ -176,67 +279,72 @@ class SpidTracker:
         limits, etc.
         """
         off_source_count = 0
-        while self.update:
-            self.current_az, self.current_alt = self.pyspid_obj.get_location()
-            current_time = Time(datetime.now())
-            alt_az = AltAz(location=location, obstime=current_time)
-            telescope_pointing = SkyCoord(
-                az=self.current_az * u.degree,
-                alt=self.current_alt * u.degree,
-                frame=alt_az,
-            )
-            separation = telescope_pointing.separation(self.track_coord).deg
-            logging.debug("Target-Telescope separation: %.2f deg", separation)
-            if separation > tolerance:
-                logging.debug(
-                    "Target-Telescope separation is outside tolerance, moving"
-                )
-                time_future = current_time + timedelta(seconds=cadence)
-                alt_az_future = AltAz(location=location, obstime=time_future)
-                track_altaz_future = self.track_coord.transform_to(alt_az_future)
-                alt_future = track_altaz_future.alt.deg
-                az_future = track_altaz_future.az.deg
-                if alt_future <= 0:
-                    self.end()
-                    raise RuntimeError("Target has set! Ending")
-
-                logging.debug(
-                    "Target will be at %.1f alt, %.1f az in %i sec, moving there",
-                    alt_future,
-                    az_future,
-                    cadence,
-                )
-                self.pyspid_obj.go_to(az=az_future, el=alt_future)
-            elif separation > 2 * tolerance:
-                logging.warning(
-                    "Target-Telescope separation is %.1f, 2x what it should be",
-                    separation,
+        while not self._stop_event.is_set():
+            if self.track_coord is None:
+                self.current_az, self.current_alt = self.pyspid_obj.get_location()
+                self._alt_az_cached = AltAzTuple(self.current_alt, self.current_az)
+            else:
+                # Ask for the location first and do the astropy work
+                # while the rotator is answering
+                self.pyspid_obj.request_location()
+                current_time = self._now()
+                # Only find the target, the telescope is already in Alt/Az
+                track_altaz = self._track_alt_az(location, current_time)
+                time_future = current_time + TimeDelta(cadence, format="sec")
+                alt_future, az_future = self._track_alt_az(location, time_future)
+                self.current_az, self.current_alt = self.pyspid_obj.read_location()
+                self._alt_az_cached = AltAzTuple(self.current_alt, self.current_az)
+
+                tgt_alt_r = radians(track_altaz.Alt)
+                tgt_az_r = radians(track_altaz.Az)
+                cur_alt_r = radians(self.current_alt)
+                cur_az_r = radians(self.current_az)
+                # spherical law of cosines, clipped against rounding past +/-1
+                cos_separation = sin(cur_alt_r) * sin(tgt_alt_r)
+                cos_separation += (
+                    cos(cur_alt_r) * cos(tgt_alt_r) * cos(cur_az_r - tgt_az_r)
                 )
-                self.on_source = False
-                off_source_count += 1
-                if off_source_count >= 2:
-                    self.end()
-                    raise RuntimeError(
-                        "Can't get on source in 3 attempts, something is wrong. Ending!"
+                separation = degrees(acos(min(1.0, max(-1.0, cos_separation))))
+                logger.debug("Target-Telescope separation: %.2f deg", separation)
+                if separation > tolerance:
+                    logger.debug(
+                        "Target-Telescope separation is outside tolerance, moving"
                     )
-            else:
-                logging.debug("Within tolerance, not moving")
-                self.on_source = True
-            sleep(cadence)
+                    if alt_future <= 0:
+                        self.end()
+                        raise RuntimeError("Target has set! Ending")
 
-    def _update_location(self, cadence: int = 30) -> None:
-        """
-        Updates pointing location without moving the telescope.
-        """
-        while self.update:
-            self.current_az, self.current_alt = self.pyspid_obj.get_location()
-            sleep(cadence)
+                    logger.debug(
+                        "Target will be at %.1f alt, %.1f az in %i sec, moving there",
+                        alt_future,
+                        az_future,
+                        cadence,
+                    )
+                    self.pyspid_obj.go_to(az=az_future, el=alt_future)
+                elif separation > 2 * tolerance:
+                    logger.warning(
+                        "Target-Telescope separation is %.1f, 2x what it should be",
+                        separation,
+                    )
+                    self.on_source = False
+                    off_source_count += 1
+                    if off_source_count >= 2:
+                        self.end()
+                        raise RuntimeError(
+                            "Can't get on source in 3 attempts, "
+                            "something is wrong. Ending!"
+                        )
+                else:
+                    logger.debug("Within tolerance, not moving")
+                    self.on_source = True
+            if self._stop_event.wait(cadence):
+                break
 
     def end(self) -> None:
         """
         Nicely Terminates the loop and closes the port.
         """
-        logging.info("Endpoint called, ending loop, closing port.")
+        logger.info("Endpoint called, ending loop, closing port.")
+        self._stop_event.set()
         self.pyspid_obj.stop()
-        self.update = False
         self.pyspid_obj.end()